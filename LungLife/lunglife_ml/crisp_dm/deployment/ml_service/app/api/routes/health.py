@@ -2,31 +2,38 @@
 Health Check Router.
 """
 from fastapi import APIRouter
-from datetime import datetime
+from fastapi.responses import ORJSONResponse
+from datetime import datetime, timezone
 import time
 
+from app.state import get_model_loader
+
 router = APIRouter()
 
-# Tiempo de inicio del servicio
-START_TIME = time.time()
+# Tiempo de inicio del servicio (reloj monotónico, inmune a saltos de reloj)
+_START_MONO = time.monotonic()
+
+# Parte estática de la respuesta, construida una sola vez al importar
+_STATIC_HEALTH = {"status": "healthy", "version": "1.0.0"}
 
 
 @router.get("/health")
 async def health_check():
     """
     Endpoint de health check.
-    
+
     Returns:
         Estado del servicio y métricas básicas.
     """
-    uptime = time.time() - START_TIME
-    
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat() + "Z",
-        "uptime_seconds": round(uptime, 2),
-        "version": "1.0.0"
-    }
+    # Los probes (K8s, sidecars) golpean esto cada segundo: solo se agregan
+    # los dos campos dinámicos sobre el dict estático precomputado
+    return ORJSONResponse({
+        **_STATIC_HEALTH,
+        "timestamp": (
+            datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        ),
+        "uptime_seconds": round(time.monotonic() - _START_MONO, 2)
+    })
 
 
 @router.get("/ready")
@@ -35,10 +42,8 @@ async def readiness_check():
     Endpoint de readiness check.
     Verifica que el modelo esté cargado.
     """
-    from app.main import get_model_loader
-    
     model_loader = get_model_loader()
-    
+
     if model_loader and model_loader.is_loaded:
         return {
             "ready": True,
@@ -1,13 +1,25 @@
 """
 Prediction Router - Endpoints de predicción ML.
 """
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import (
+    BaseModel, ConfigDict, Field, TypeAdapter, ValidationError,
+    field_serializer, field_validator
+)
+from starlette.concurrency import run_in_threadpool
+
+from app.core.model_loader import ModelLoader
+from app.state import get_model_loader
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
+import asyncio
 import logging
+import zlib
 import numpy as np
 
+from app.config import settings
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
@@ -59,9 +71,19 @@ class PatientData(BaseModel):
     dietary_habits: str = Field("Average", description="Poor/Average/Good")
     occupation: str = Field("Unknown", description="Ocupación del paciente")
 
-    class Config:
-        populate_by_name = True
-        json_schema_extra = {
+    @field_validator(
+        "gender", "smoking_history", "residential_area",
+        "physical_activity_level", "dietary_habits", mode="before"
+    )
+    @classmethod
+    def _lowercase(cls, value):
+        """Normaliza a minúsculas en la validación (una sola vez por campo)."""
+        return value.lower() if isinstance(value, str) else value
+
+    model_config = ConfigDict(
+        populate_by_name=True,
+        validate_default=True,
+        json_schema_extra={
             "example": {
                 "age": 55,
                 "gender": "Male",
@@ -86,6 +108,7 @@ class PatientData(BaseModel):
                 "occupation": "Construction Worker"
             }
         }
+    )
 
 
 class FeatureContribution(BaseModel):
@@ -106,6 +129,11 @@ class PredictionResponse(BaseModel):
     recommendation: str
     timestamp: str
 
+    @field_serializer('probability', 'confidence')
+    def _round4(self, value: float) -> float:
+        """Redondea a 4 decimales al serializar (corre en pydantic-core)."""
+        return round(value, 4)
+
 
 class BatchPredictionRequest(BaseModel):
     """Request para predicción por lotes."""
@@ -119,14 +147,66 @@ class BatchPredictionResponse(BaseModel):
     processing_time_ms: float
 
 
+# Validador precompilado para la lista de pacientes del batch: usa el
+# fast-path de listas de pydantic-core sin el wrapper BatchPredictionRequest
+_BATCH_ADAPTER = TypeAdapter(List[PatientData])
+
+
 # =============================================================================
 # HELPERS
 # =============================================================================
 
-def patient_to_features(patient: PatientData) -> np.ndarray:
+# Mapas de codificación precomputados una sola vez al importar el módulo.
+_GENDER_MALE = frozenset({"male", "m", "masculino"})
+_SMOKING_MAP = {"never": 0, "former": 1, "current": 2}
+_AREA_MAP = {"urban": 0, "suburban": 1, "rural": 2}
+_ACTIVITY_MAP = {"low": 0, "moderate": 1, "high": 2}
+_DIET_MAP = {"poor": 0, "average": 1, "good": 2}
+
+# Buckets etarios: <41 -> 18-40, 41-60, >60 (bordes para np.digitize)
+_AGE_BUCKET_EDGES = np.array([41.0, 61.0], dtype=np.float32)
+_AGE_ONEHOT = np.eye(3, dtype=np.float32)
+
+# LUT de popcount para los 4 bits de síntomas empaquetados
+_POPCOUNT_LUT = np.array([bin(i).count("1") for i in range(16)], dtype=np.uint8)
+
+# Pesos del score compuesto de riesgo, fijos para el layout de 29 features
+_W_AGE = np.float32(0.15)
+_W_PACK_YEARS = np.float32(0.25)
+_W_SYMPTOMS = np.float32(0.20)
+_W_FAMILY = np.float32(0.15)
+_W_ENV = np.float32(0.10)
+_W_FEV1 = np.float32(0.15)
+
+
+@lru_cache(maxsize=1024)
+def _encode_occupation(occupation: str) -> float:
     """
-    Convierte datos del paciente a array de 29 features.
-    
+    Codifica la ocupación en un valor numérico (hash simplificado).
+
+    Memoizada: las ocupaciones se repiten mucho en tráfico real, así se
+    evita el `.lower()` + hash por fila. Usa crc32 y no `hash()` builtin:
+    este último está salteado por proceso, y con varios workers el mismo
+    payload daría una feature distinta según quién lo atienda.
+    """
+    return zlib.crc32(occupation.lower().encode("utf-8")) % 10 / 10.0
+
+
+def _comorbidities_count(comorbidities: Optional[str]) -> int:
+    """Cuenta las comorbilidades declaradas (separadas por coma)."""
+    if comorbidities and comorbidities.upper() != "NONE":
+        return len(comorbidities.split(","))
+    return 0
+
+
+def patients_to_features_batch(patients: List[PatientData]) -> np.ndarray:
+    """
+    Convierte una lista de pacientes a una matriz (N, 29) de features.
+
+    Empaqueta primero los campos crudos en arrays columnares (SoA) y luego
+    calcula las features derivadas de forma vectorizada, evitando construir
+    un array por paciente.
+
     Features esperadas por el modelo:
     0: Age
     1: Years_Smoked
@@ -156,119 +236,289 @@ def patient_to_features(patient: PatientData) -> np.ndarray:
     27: Environmental_Risk (derived)
     28: Risk_Score_Composite (derived)
     """
-    # Age groups (one-hot encoding)
-    age_18_40 = 1 if 18 <= patient.age <= 40 else 0
-    age_41_60 = 1 if 41 <= patient.age <= 60 else 0
-    age_61_plus = 1 if patient.age > 60 else 0
-    
-    # Gender encoding
-    gender_encoded = 1 if patient.gender.lower() in ["male", "m", "masculino"] else 0
-    
-    # Smoking history encoding
-    smoking_map = {"never": 0, "former": 1, "current": 2}
-    smoking_encoded = smoking_map.get(patient.smoking_history.lower(), 0)
-    
-    # Occupation encoding (simplified - use hash for variety)
-    occupation_encoded = abs(hash(patient.occupation.lower())) % 10 / 10.0
-    
-    # Residential area encoding
-    area_map = {"urban": 0, "suburban": 1, "rural": 2}
-    residential_encoded = area_map.get(patient.residential_area.lower(), 0)
-    
-    # Physical activity encoding
-    activity_map = {"low": 0, "moderate": 1, "high": 2}
-    activity_encoded = activity_map.get(patient.physical_activity_level.lower(), 1)
-    
-    # Dietary habits encoding
-    diet_map = {"poor": 0, "average": 1, "good": 2}
-    diet_encoded = diet_map.get(patient.dietary_habits.lower(), 1)
-    
-    # Comorbidities count
-    if patient.comorbidities and patient.comorbidities.upper() != "NONE":
-        comorbidities_count = len(patient.comorbidities.split(","))
-    else:
-        comorbidities_count = 0
-    
-    # Pack years normalized (0-1 scale, assuming max ~100)
-    pack_years_normalized = min(patient.pack_years / 100.0, 1.0)
-    
-    # Smoking risk level (derived from smoking history and pack years)
-    if smoking_encoded == 0:
-        smoking_risk = 0
-    elif patient.pack_years > 30:
-        smoking_risk = 3
-    elif patient.pack_years > 15:
-        smoking_risk = 2
-    else:
-        smoking_risk = 1
-    
-    # Symptom count
-    symptom_count = sum([
-        int(patient.chest_pain_symptoms),
-        int(patient.shortness_of_breath),
-        int(patient.chronic_cough),
-        int(patient.weight_loss)
-    ])
-    
-    # Environmental risk (derived from air quality and toxin exposure)
-    aqi_risk = 1 if patient.air_quality_index > 100 else 0
-    environmental_risk = aqi_risk + int(patient.exposure_to_toxins)
-    
-    # Risk score composite (weighted combination)
+    n = len(patients)
+
+    # --- SoA: columnas crudas -------------------------------------------------
+    # np.fromiter con count=n escribe cada columna en un solo array ya
+    # dimensionado, sin lista intermedia ni arrays pequeños por paciente
+    ages = np.fromiter((p.age for p in patients), dtype=np.float32, count=n)
+    years_smoked = np.fromiter(
+        (p.years_smoked for p in patients), dtype=np.float32, count=n
+    )
+    pack_years = np.fromiter(
+        (p.pack_years for p in patients), dtype=np.float32, count=n
+    )
+    bmi = np.fromiter((p.bmi for p in patients), dtype=np.float32, count=n)
+    fev1 = np.fromiter(
+        (p.lung_function_test_result for p in patients), dtype=np.float32, count=n
+    )
+    aqi = np.fromiter(
+        (p.air_quality_index for p in patients), dtype=np.float32, count=n
+    )
+    tumor = np.fromiter(
+        (p.tumor_size_cm for p in patients), dtype=np.float32, count=n
+    )
+
+    # Los campos de texto ya llegan en minúsculas desde la validación Pydantic
+    gender_i = np.fromiter(
+        (1.0 if p.gender in _GENDER_MALE else 0.0 for p in patients),
+        dtype=np.float32, count=n
+    )
+    smoking_i = np.fromiter(
+        (_SMOKING_MAP.get(p.smoking_history, 0) for p in patients),
+        dtype=np.float32, count=n
+    )
+    area_i = np.fromiter(
+        (_AREA_MAP.get(p.residential_area, 0) for p in patients),
+        dtype=np.float32, count=n
+    )
+    activity_i = np.fromiter(
+        (_ACTIVITY_MAP.get(p.physical_activity_level, 1) for p in patients),
+        dtype=np.float32, count=n
+    )
+    diet_i = np.fromiter(
+        (_DIET_MAP.get(p.dietary_habits, 1) for p in patients),
+        dtype=np.float32, count=n
+    )
+    occupation_f = np.fromiter(
+        (_encode_occupation(p.occupation) for p in patients),
+        dtype=np.float32, count=n
+    )
+    comorb_count = np.fromiter(
+        (_comorbidities_count(p.comorbidities) for p in patients),
+        dtype=np.float32, count=n
+    )
+
+    # Síntomas empaquetados en 4 bits por paciente: un solo uint8 por fila
+    symptom_flags = np.fromiter(
+        (
+            (p.chest_pain_symptoms << 3) | (p.shortness_of_breath << 2) |
+            (p.chronic_cough << 1) | p.weight_loss
+            for p in patients
+        ),
+        dtype=np.uint8, count=n
+    )
+    chest_pain = ((symptom_flags >> 3) & 1).astype(np.float32)
+    short_breath = ((symptom_flags >> 2) & 1).astype(np.float32)
+    cough = ((symptom_flags >> 1) & 1).astype(np.float32)
+    weight_loss = (symptom_flags & 1).astype(np.float32)
+
+    family_history = np.fromiter(
+        (p.family_history_cancer for p in patients), dtype=np.float32, count=n
+    )
+    toxins = np.fromiter(
+        (p.exposure_to_toxins for p in patients), dtype=np.float32, count=n
+    )
+    prev_cancer = np.fromiter(
+        (p.previous_cancer_diagnosis for p in patients), dtype=np.float32, count=n
+    )
+
+    # --- Features derivadas (vectorizadas) -----------------------------------
+    # One-hot de grupo etario sin branches: una sola pasada con digitize
+    age_onehot = _AGE_ONEHOT[np.digitize(ages, _AGE_BUCKET_EDGES)]
+
+    pack_years_normalized = np.minimum(pack_years / 100.0, 1.0)
+
+    smoking_risk = np.where(
+        smoking_i == 0,
+        0,
+        np.where(pack_years > 30, 3, np.where(pack_years > 15, 2, 1))
+    ).astype(np.float32)
+
+    symptom_count = _POPCOUNT_LUT[symptom_flags].astype(np.float32)
+
+    environmental_risk = (aqi > 100).astype(np.float32) + toxins
+
     risk_composite = (
-        (patient.age / 100.0) * 0.15 +
-        pack_years_normalized * 0.25 +
-        (symptom_count / 4.0) * 0.2 +
-        int(patient.family_history_cancer) * 0.15 +
-        environmental_risk * 0.1 +
-        (1 - patient.lung_function_test_result / 100.0) * 0.15
+        (ages / 100.0) * _W_AGE +
+        pack_years_normalized * _W_PACK_YEARS +
+        (symptom_count / 4.0) * _W_SYMPTOMS +
+        family_history * _W_FAMILY +
+        environmental_risk * _W_ENV +
+        (1 - fev1 / 100.0) * _W_FEV1
     )
-    
-    # Build the 29-feature array
-    features = np.array([
-        patient.age,                          # 0: Age
-        patient.years_smoked,                 # 1: Years_Smoked
-        patient.pack_years,                   # 2: Pack_Years
-        patient.bmi,                          # 3: BMI
-        patient.lung_function_test_result,    # 4: Lung_Function_Test_Result
-        patient.air_quality_index,            # 5: Air_Quality_Index
-        patient.tumor_size_cm,                # 6: Tumor_Size_cm
-        age_18_40,                            # 7: Age_Group_18-40
-        age_41_60,                            # 8: Age_Group_41-60
-        age_61_plus,                          # 9: Age_Group_61+
-        gender_encoded,                       # 10: Gender
-        smoking_encoded,                      # 11: Smoking_History
-        int(patient.family_history_cancer),   # 12: Family_History_Cancer
-        occupation_encoded,                   # 13: Occupation
-        int(patient.exposure_to_toxins),      # 14: Exposure_to_Toxins
-        residential_encoded,                  # 15: Residential_Area
-        int(patient.chest_pain_symptoms),     # 16: Chest_Pain_Symptoms
-        int(patient.shortness_of_breath),     # 17: Shortness_of_Breath
-        int(patient.chronic_cough),           # 18: Chronic_Cough
-        int(patient.weight_loss),             # 19: Weight_Loss
-        activity_encoded,                     # 20: Physical_Activity_Level
-        diet_encoded,                         # 21: Dietary_Habits
-        comorbidities_count,                  # 22: Comorbidities
-        int(patient.previous_cancer_diagnosis), # 23: Previous_Cancer_Diagnosis
-        pack_years_normalized,                # 24: Pack_Years_Normalized
-        smoking_risk,                         # 25: Smoking_Risk_Level
-        symptom_count,                        # 26: Symptom_Count
-        environmental_risk,                   # 27: Environmental_Risk
-        risk_composite                        # 28: Risk_Score_Composite
-    ], dtype=np.float64)
-    
+
+    # --- Matriz final (N, 29) -------------------------------------------------
+    features = np.empty((n, 29), dtype=np.float32)
+    features[:, 0] = ages
+    features[:, 1] = years_smoked
+    features[:, 2] = pack_years
+    features[:, 3] = bmi
+    features[:, 4] = fev1
+    features[:, 5] = aqi
+    features[:, 6] = tumor
+    features[:, 7:10] = age_onehot
+    features[:, 10] = gender_i
+    features[:, 11] = smoking_i
+    features[:, 12] = family_history
+    features[:, 13] = occupation_f
+    features[:, 14] = toxins
+    features[:, 15] = area_i
+    features[:, 16] = chest_pain
+    features[:, 17] = short_breath
+    features[:, 18] = cough
+    features[:, 19] = weight_loss
+    features[:, 20] = activity_i
+    features[:, 21] = diet_i
+    features[:, 22] = comorb_count
+    features[:, 23] = prev_cancer
+    features[:, 24] = pack_years_normalized
+    features[:, 25] = smoking_risk
+    features[:, 26] = symptom_count
+    features[:, 27] = environmental_risk
+    features[:, 28] = risk_composite
+
     return features
 
 
+def patient_to_features(patient: PatientData) -> np.ndarray:
+    """Convierte los datos de un paciente a un array de 29 features."""
+    return patients_to_features_batch([patient])[0]
+
+
+# Umbrales de riesgo y textos fijos, alineados con los niveles del modelo
+_RISK_THRESHOLDS = np.array([0.3, 0.5, 0.7])
+_RISK_LEVELS = ("LOW", "MODERATE", "HIGH", "VERY_HIGH")
+_RECOMMENDATIONS = np.array([
+    "Continuar con controles de rutina. Mantener hábitos saludables.",
+    "Se recomienda seguimiento médico en los próximos 3 meses.",
+    "Se recomienda evaluación médica especializada pronto.",
+    "Se recomienda evaluación médica urgente con especialista."
+], dtype=object)
+
+
 def get_recommendation(risk_level: str) -> str:
     """Genera recomendación basada en el nivel de riesgo."""
-    recommendations = {
-        "LOW": "Continuar con controles de rutina. Mantener hábitos saludables.",
-        "MODERATE": "Se recomienda seguimiento médico en los próximos 3 meses.",
-        "HIGH": "Se recomienda evaluación médica especializada pronto.",
-        "VERY_HIGH": "Se recomienda evaluación médica urgente con especialista."
-    }
-    return recommendations.get(risk_level, "Consulte con su médico.")
+    try:
+        return _RECOMMENDATIONS[_RISK_LEVELS.index(risk_level)]
+    except ValueError:
+        return "Consulte con su médico."
+
+
+def _run_prediction(
+    model_loader,
+    features: np.ndarray,
+    explain: bool = True
+) -> List[PredictionResponse]:
+    """
+    Ejecuta el modelo sobre una matriz (N, 29) y construye las respuestas.
+
+    Camino compartido por `/predict` y `/predict/batch`: una sola llamada
+    al modelo, sin re-entrar al handler HTTP por fila.
+    """
+    results = model_loader.predict_many(features, explain=explain)
+
+    # Un solo timestamp por lote: evita un datetime + formateo por fila
+    timestamp = (
+        datetime.now(timezone.utc)
+        .isoformat(timespec="milliseconds")
+        .replace("+00:00", "Z")
+    )
+
+    # Recomendaciones resueltas de forma vectorizada sobre las probabilidades
+    probabilities = np.fromiter(
+        (result["probability"] for result in results),
+        dtype=np.float64,
+        count=len(results)
+    )
+    recommendations = _RECOMMENDATIONS[
+        np.searchsorted(_RISK_THRESHOLDS, probabilities, side="right")
+    ]
+
+    # model_construct omite la re-validación pydantic: los valores salen del
+    # propio model loader y ya cumplen los rangos declarados en el schema
+    return [
+        PredictionResponse.model_construct(
+            prediction=result["prediction"],
+            probability=result["probability"],
+            risk_level=result["risk_level"],
+            confidence=result["confidence"],
+            model_version=result["model_version"],
+            top_features=[
+                FeatureContribution.model_construct(**f)
+                for f in result.get("top_features", [])
+            ],
+            recommendation=recommendation,
+            timestamp=timestamp
+        )
+        for result, recommendation in zip(results, recommendations)
+    ]
+
+
+class _MicroBatcher:
+    """
+    Coalescing de requests concurrentes a `/predict`.
+
+    Junta las llamadas que llegan dentro de una ventana corta
+    (BATCH_WAIT_MS, hasta BATCH_MAX filas), las resuelve con una sola
+    pasada de `predict_many` y reparte los resultados a cada future.
+    Bajo carga el throughput escala con el tamaño del lote; con una sola
+    request en vuelo la espera máxima es la ventana.
+    """
+
+    def __init__(self, max_batch: int, max_wait_ms: float):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker_task: Optional[asyncio.Task] = None
+
+    async def submit(
+        self,
+        model_loader,
+        features: np.ndarray,
+        explain: bool
+    ) -> PredictionResponse:
+        """Encola una fila (1, 29) y espera su respuesta."""
+        loop = asyncio.get_running_loop()
+        if self._worker_task is None or self._worker_task.done():
+            self._worker_task = loop.create_task(self._worker())
+
+        future: asyncio.Future = loop.create_future()
+        await self._queue.put((model_loader, features, explain, future))
+        return await future
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            model_loader, features, explain, future = await self._queue.get()
+            batch = [(features, explain, future)]
+
+            # Acumular hasta BATCH_MAX filas o agotar la ventana de espera
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    _, more_features, more_explain, more_future = (
+                        await asyncio.wait_for(self._queue.get(), timeout)
+                    )
+                except asyncio.TimeoutError:
+                    break
+                batch.append((more_features, more_explain, more_future))
+
+            matrix = np.vstack([item[0] for item in batch])
+            explain_any = any(item[1] for item in batch)
+
+            try:
+                responses = await run_in_threadpool(
+                    _run_prediction, model_loader, matrix, explain_any
+                )
+            except Exception as e:
+                for _, _, item_future in batch:
+                    if not item_future.done():
+                        item_future.set_exception(e)
+                continue
+
+            for (_, item_explain, item_future), response in zip(batch, responses):
+                if item_future.done():
+                    continue
+                if explain_any and not item_explain:
+                    response = response.model_copy(update={"top_features": []})
+                item_future.set_result(response)
+
+
+_batcher = _MicroBatcher(settings.BATCH_MAX, settings.BATCH_WAIT_MS)
 
 
 # =============================================================================
@@ -276,47 +526,35 @@ def get_recommendation(risk_level: str) -> str:
 # =============================================================================
 
 @router.post("/predict", response_model=PredictionResponse)
-async def predict(patient: PatientData):
+async def predict(
+    patient: PatientData,
+    explain: bool = True,
+    model_loader: Optional[ModelLoader] = Depends(get_model_loader)
+):
     """
     Realiza una predicción de riesgo de cáncer pulmonar.
-    
+
     Args:
         patient: Datos clínicos del paciente
-        
+        explain: Si incluir contribuciones SHAP (`?explain=false` las omite
+            y evita todo el costo de interpretabilidad)
+        model_loader: Instancia global inyectada por FastAPI
+
     Returns:
         Predicción con probabilidad, nivel de riesgo e interpretabilidad
     """
-    from app.main import get_model_loader
-    
-    model_loader = get_model_loader()
-    
     if not model_loader or not model_loader.is_loaded:
         raise HTTPException(
             status_code=503,
             detail="Modelo no disponible. Intente más tarde."
         )
-    
+
     try:
-        # Convertir a features
-        features = patient_to_features(patient)
-        
-        # Realizar predicción
-        result = model_loader.predict(features)
-        
-        # Construir respuesta
-        return PredictionResponse(
-            prediction=result["prediction"],
-            probability=round(result["probability"], 4),
-            risk_level=result["risk_level"],
-            confidence=round(result["confidence"], 4),
-            model_version=result["model_version"],
-            top_features=[
-                FeatureContribution(**f) for f in result.get("top_features", [])
-            ],
-            recommendation=get_recommendation(result["risk_level"]),
-            timestamp=datetime.utcnow().isoformat() + "Z"
-        )
-        
+        features = patients_to_features_batch([patient])
+        # El batcher coalesce requests concurrentes en una sola pasada del
+        # modelo y ejecuta la inferencia en el threadpool
+        return await _batcher.submit(model_loader, features, explain)
+
     except Exception as e:
         logger.error(f"Error en predicción: {e}")
         raise HTTPException(
@@ -326,29 +564,68 @@ async def predict(patient: PatientData):
 
 
 @router.post("/predict/batch", response_model=BatchPredictionResponse)
-async def predict_batch(request: BatchPredictionRequest):
+async def predict_batch(
+    request: Request,
+    model_loader: Optional[ModelLoader] = Depends(get_model_loader)
+):
     """
     Realiza predicciones para múltiples pacientes.
-    
+
+    Body esperado: `{"patients": [...]}` con máximo 100 pacientes.
+
     Args:
-        request: Lista de pacientes (máximo 100)
-        
+        request: Request crudo; se valida con el TypeAdapter precompilado
+        model_loader: Instancia global inyectada por FastAPI
+
     Returns:
         Lista de predicciones
     """
     import time
     start_time = time.time()
-    
-    predictions = []
-    for patient in request.patients:
-        try:
-            pred = await predict(patient)
-            predictions.append(pred)
-        except HTTPException as e:
-            raise e
-        except Exception as e:
-            logger.error(f"Error en batch: {e}")
-    
+
+    # Validación con el fast-path de pydantic-core para listas
+    try:
+        body = await request.json()
+        patients = _BATCH_ADAPTER.validate_python(body.get("patients", []))
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+    except (ValueError, AttributeError):
+        raise HTTPException(status_code=400, detail="Body JSON inválido")
+
+    if len(patients) > 100:
+        raise HTTPException(
+            status_code=400,
+            detail="Máximo 100 pacientes por solicitud"
+        )
+
+    # Lote vacío: responder directo sin tocar el modelo (predict_proba
+    # rechaza matrices de 0 filas)
+    if not patients:
+        return BatchPredictionResponse(
+            predictions=[],
+            total_processed=0,
+            processing_time_ms=round((time.time() - start_time) * 1000, 2)
+        )
+
+    if not model_loader or not model_loader.is_loaded:
+        raise HTTPException(
+            status_code=503,
+            detail="Modelo no disponible. Intente más tarde."
+        )
+
+    try:
+        # Una sola llamada batched: features (N, 29) -> modelo.
+        # Tanto el armado de features como la inferencia son CPU-bound,
+        # así que corren en el threadpool para no bloquear el event loop.
+        features = await run_in_threadpool(patients_to_features_batch, patients)
+        predictions = await run_in_threadpool(_run_prediction, model_loader, features)
+    except Exception as e:
+        logger.error(f"Error en batch: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error al procesar predicción: {str(e)}"
+        )
+
     processing_time = (time.time() - start_time) * 1000
     
     return BatchPredictionResponse(
@@ -9,6 +9,7 @@ Version: 1.0.0
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 
 from app.models.schemas import (
     PatientDataRequest,
@@ -75,7 +76,7 @@ async def create_prediction(
             extra={
                 "request_id": request_id,
                 "patient_age": patient_data.age,
-                "smoking_history": patient_data.smoking_history.value,
+                "smoking_history": patient_data.smoking_history,
             }
         )
 
@@ -88,7 +89,7 @@ async def create_prediction(
             extra={
                 "request_id": request_id,
                 "prediction": prediction_result.prediction,
-                "risk_level": prediction_result.risk_level.value,
+                "risk_level": prediction_result.risk_level,
             }
         )
 
@@ -136,16 +137,16 @@ async def create_batch_predictions(
             detail="Maximum batch size is 100 patients"
         )
 
-    predictions = []
-    for patient_data in patients_data:
-        try:
-            prediction = prediction_service.predict(patient_data)
-            predictions.append(prediction)
-        except Exception as e:
-            logger.error(f"Batch prediction failed for patient: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Batch prediction failed: {str(e)}"
-            )
-
-    return predictions
+    try:
+        # One vectorized model pass for the whole batch instead of N
+        # sequential predict() calls; runs in the threadpool since it is
+        # CPU-bound
+        return await run_in_threadpool(
+            prediction_service.predict_batch, patients_data
+        )
+    except Exception as e:
+        logger.exception(f"Batch prediction failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch prediction failed: {str(e)}"
+        )
@@ -28,6 +28,15 @@ class Settings(BaseSettings):
     
     # Model
     MODEL_VERSION: str = "1.0.0"
+
+    # Micro-batching de /predict (coalescing de requests concurrentes)
+    BATCH_MAX: int = int(os.getenv("BATCH_MAX", "32"))
+    BATCH_WAIT_MS: float = float(os.getenv("BATCH_WAIT_MS", "5"))
+
+    # Header X-Process-Time en las respuestas (desactivable en producción)
+    EXPOSE_PROCESS_TIME: bool = (
+        os.getenv("EXPOSE_PROCESS_TIME", "true").lower() == "true"
+    )
     
     class Config:
         env_file = ".env"
@@ -4,12 +4,17 @@ Model Loader - Carga y gestión del modelo ML.
 import joblib
 import json
 import logging
+import threading
 from pathlib import Path
 from typing import Optional, Dict, Any
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Umbrales y niveles de riesgo fijos; indexados con np.searchsorted
+_RISK_THRESHOLDS = np.array([0.3, 0.5, 0.7])
+_RISK_LEVELS = np.array(["LOW", "MODERATE", "HIGH", "VERY_HIGH"])
+
 
 class ModelLoader:
     """
@@ -35,13 +40,26 @@ class ModelLoader:
         self.shap_explainer = None
         self.config: Dict[str, Any] = {}
         self._is_loaded = False
+        # Buffer (1, F) reutilizable por hilo para el camino single-patient;
+        # thread-local porque predict corre dentro del threadpool de Starlette
+        self._scratch = threading.local()
+        # El explainer SHAP se carga lazy en el primer uso
+        self._shap_lock = threading.Lock()
+        self._shap_attempted = False
     
     def load(self) -> None:
         """Carga el modelo y recursos asociados."""
         try:
-            # Cargar modelo principal
+            # Cargar modelo principal. mmap_mode='r' deja los ndarrays del
+            # estimador mapeados en memoria de solo lectura: los workers
+            # comparten esas páginas vía el page cache del SO.
             logger.info(f"Cargando modelo desde: {self.model_path}")
-            self.model = joblib.load(self.model_path)
+            self.model = joblib.load(self.model_path, mmap_mode='r')
+            # Un n_jobs heredado del entrenamiento lanza workers de joblib
+            # en cada predict; para lotes chicos y filas individuales ese
+            # overhead supera al cómputo de los árboles
+            if hasattr(self.model, 'n_jobs'):
+                self.model.n_jobs = 1
             logger.info("Modelo cargado exitosamente")
             
             # Cargar configuración
@@ -50,67 +68,118 @@ class ModelLoader:
                     self.config = json.load(f)
                 logger.info(f"Configuración cargada: {self.config}")
             
-            # Cargar SHAP explainer (opcional)
+            # El explainer SHAP no se carga acá: se difiere al primer uso
+            # (_ensure_shap) para no bloquear el readiness del servicio
+
+            self._is_loaded = True
+
+        except Exception as e:
+            logger.error(f"Error al cargar modelo: {e}")
+            raise
+
+    def _ensure_shap(self) -> None:
+        """Carga el explainer SHAP en el primer uso (double-checked lock)."""
+        if self._shap_attempted:
+            return
+
+        with self._shap_lock:
+            if self._shap_attempted:
+                return
             if self.shap_path and self.shap_path.exists():
                 try:
                     self.shap_explainer = joblib.load(self.shap_path)
                     logger.info("SHAP explainer cargado")
                 except Exception as e:
                     logger.warning(f"No se pudo cargar SHAP: {e}")
-            
-            self._is_loaded = True
-            
-        except Exception as e:
-            logger.error(f"Error al cargar modelo: {e}")
-            raise
+            self._shap_attempted = True
     
     @property
     def is_loaded(self) -> bool:
         """Verifica si el modelo está cargado."""
         return self._is_loaded
     
-    def predict(self, features: np.ndarray) -> Dict[str, Any]:
+    def predict(self, features: np.ndarray, explain: bool = True) -> Dict[str, Any]:
         """
         Realiza una predicción.
-        
+
         Args:
             features: Array de características del paciente
-            
+            explain: Si calcular contribuciones SHAP (domina la latencia)
+
         Returns:
             Diccionario con predicción, probabilidad e interpretabilidad
         """
+        n_features = features.shape[-1]
+        buffer = getattr(self._scratch, "buffer", None)
+        if buffer is None or buffer.shape[1] != n_features:
+            buffer = np.empty((1, n_features), dtype=np.float32)
+            self._scratch.buffer = buffer
+
+        np.copyto(buffer[0], features)
+        return self.predict_many(buffer, explain=explain)[0]
+
+    def predict_many(self, features: np.ndarray, explain: bool = True) -> list:
+        """
+        Realiza predicciones para un lote de pacientes en una sola llamada.
+
+        Args:
+            features: Matriz (N, features) con un paciente por fila
+            explain: Si calcular contribuciones SHAP para cada fila
+
+        Returns:
+            Lista de diccionarios, uno por fila, con el mismo formato
+            que `predict`
+        """
         if not self._is_loaded:
             raise RuntimeError("Modelo no cargado")
-        
-        # Predicción
-        prediction = int(self.model.predict(features.reshape(1, -1))[0])
-        
-        # Probabilidad
+
+        # Una sola llamada batched al modelo (sklearn amortiza el costo por fila)
         if hasattr(self.model, 'predict_proba'):
-            probabilities = self.model.predict_proba(features.reshape(1, -1))[0]
-            probability = float(probabilities[1])  # Probabilidad de clase positiva
+            probabilities = self.model.predict_proba(features)[:, 1]
+            predictions = (probabilities >= 0.5).astype(np.int8)
         else:
-            probability = float(prediction)
-        
-        # Clasificación de riesgo
-        risk_level = self._classify_risk(probability)
-        
-        # Interpretabilidad SHAP
-        top_features = []
-        if self.shap_explainer is not None:
+            predictions = self.model.predict(features).astype(np.int8)
+            probabilities = predictions.astype(np.float64)
+
+        # Clasificación de riesgo y confianza, vectorizadas
+        risk_levels = _RISK_LEVELS[
+            np.searchsorted(_RISK_THRESHOLDS, probabilities, side="right")
+        ]
+        confidences = np.abs(probabilities - 0.5) * 2
+
+        # SHAP una sola vez para todo el lote (amortiza el setup del explainer)
+        shap_matrix = None
+        if explain:
+            self._ensure_shap()
+        if explain and self.shap_explainer is not None:
             try:
-                top_features = self._get_shap_contributions(features)
+                shap_values = self.shap_explainer.shap_values(features)
+                # Si es clasificación binaria, tomar valores de clase positiva
+                if isinstance(shap_values, list):
+                    shap_matrix = np.asarray(shap_values[1])
+                else:
+                    shap_matrix = np.asarray(shap_values)
             except Exception as e:
                 logger.warning(f"Error al calcular SHAP: {e}")
-        
-        return {
-            "prediction": prediction,
-            "probability": probability,
-            "risk_level": risk_level,
-            "confidence": self._calculate_confidence(probability),
-            "top_features": top_features,
-            "model_version": self.config.get("version", "1.0.0")
-        }
+
+        model_version = self.config.get("version", "1.0.0")
+
+        results = []
+        for i in range(features.shape[0]):
+            top_features = []
+            if shap_matrix is not None:
+                top_features = self._top_contributions(shap_matrix[i])
+
+            results.append({
+                "prediction": int(predictions[i]),
+                "probability": float(probabilities[i]),
+                "risk_level": str(risk_levels[i]),
+                "confidence": float(confidences[i]),
+                "top_features": top_features,
+                "model_version": model_version
+            })
+
+        return results
     
     def _classify_risk(self, probability: float) -> str:
         """Clasifica el nivel de riesgo según la probabilidad."""
@@ -127,41 +196,28 @@ class ModelLoader:
         """Calcula la confianza del modelo."""
         return abs(probability - 0.5) * 2
     
-    def _get_shap_contributions(self, features: np.ndarray) -> list:
-        """Obtiene las contribuciones SHAP de las características."""
-        if self.shap_explainer is None:
-            return []
-        
-        try:
-            shap_values = self.shap_explainer.shap_values(features.reshape(1, -1))
-            
-            # Obtener nombres de features
-            feature_names = self.config.get("feature_names", [
-                "age", "gender", "smoking", "yellow_fingers", "anxiety",
-                "peer_pressure", "chronic_disease", "fatigue", "allergy",
-                "wheezing", "alcohol_consuming", "coughing", 
-                "shortness_of_breath", "swallowing_difficulty", "chest_pain"
-            ])
-            
-            # Si es clasificación binaria, tomar valores de clase positiva
-            if isinstance(shap_values, list):
-                values = shap_values[1][0]
-            else:
-                values = shap_values[0]
-            
-            # Crear lista de contribuciones
-            contributions = []
-            for i, (name, value) in enumerate(zip(feature_names, values)):
-                contributions.append({
-                    "feature": name,
-                    "contribution": abs(float(value)),
-                    "direction": "positive" if value > 0 else "negative"
-                })
-            
-            # Ordenar por contribución y tomar top 5
-            contributions.sort(key=lambda x: x["contribution"], reverse=True)
-            return contributions[:5]
-            
-        except Exception as e:
-            logger.error(f"Error en SHAP: {e}")
-            return []
+    def _top_contributions(self, values: np.ndarray, top_n: int = 5) -> list:
+        """Extrae las top-N contribuciones SHAP de una fila ya calculada."""
+        feature_names = self.config.get("feature_names", [
+            "age", "gender", "smoking", "yellow_fingers", "anxiety",
+            "peer_pressure", "chronic_disease", "fatigue", "allergy",
+            "wheezing", "alcohol_consuming", "coughing",
+            "shortness_of_breath", "swallowing_difficulty", "chest_pain"
+        ])
+
+        # Top-N por magnitud con argpartition (O(n)) en vez de sort completo
+        abs_values = np.abs(values)
+        k = min(top_n, abs_values.shape[0])
+        top_idx = np.argpartition(-abs_values, k - 1)[:k]
+        top_idx = top_idx[np.argsort(-abs_values[top_idx])]
+
+        return [
+            {
+                "feature": (
+                    feature_names[i] if i < len(feature_names) else f"feature_{i}"
+                ),
+                "contribution": float(abs_values[i]),
+                "direction": "positive" if values[i] > 0 else "negative"
+            }
+            for i in top_idx
+        ]
@@ -0,0 +1,64 @@
+"""
+LungLife ML Service - Dependency Providers.
+
+FastAPI dependency wiring for the prediction endpoints. Model artifacts
+are loaded once per worker with ``mmap_mode='r'``: the estimator's numpy
+arrays stay memory-mapped read-only, so under multiple uvicorn workers
+the OS page cache shares those pages instead of duplicating the model
+in every process RSS.
+
+Author: LungLife Team
+Version: 1.0.0
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+
+import joblib
+
+from app.config import settings
+from app.services.prediction_service import PredictionService
+
+
+@lru_cache(maxsize=1)
+def get_prediction_service() -> PredictionService:
+    """
+    Build the per-worker PredictionService singleton.
+
+    lru_cache makes this a one-time load per process; FastAPI calls it
+    on every request but only the first call pays the artifact I/O.
+
+    Returns:
+        PredictionService wired with the mmap-loaded model, the label
+        encoders, and the model configuration.
+    """
+    model = joblib.load(settings.MODEL_PATH, mmap_mode='r')
+    # Inherited n_jobs would spin up joblib workers per predict call;
+    # for single rows and small batches that overhead dwarfs the tree walk
+    if hasattr(model, 'n_jobs'):
+        model.n_jobs = 1
+
+    encoders_path = Path(settings.MODEL_PATH).with_name("label_encoders.joblib")
+    label_encoders = joblib.load(encoders_path) if encoders_path.exists() else {}
+
+    config_path = Path(settings.CONFIG_PATH)
+    config = json.loads(config_path.read_text()) if config_path.exists() else {}
+
+    return PredictionService(model=model, label_encoders=label_encoders, config=config)
+
+
+@lru_cache(maxsize=1)
+def get_predictor():
+    """
+    Per-worker predictor singleton for the legacy router.
+
+    The import is deferred so this module stays importable in
+    deployments that only ship the v1 endpoints.
+    """
+    from app.core.predictor import Predictor
+
+    return Predictor(
+        model_path=settings.MODEL_PATH,
+        config_path=settings.CONFIG_PATH,
+    )
@@ -7,36 +7,44 @@ Versión: 1.0.0
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from contextlib import asynccontextmanager
 import logging
+import logging.handlers
+import orjson
+import queue
 import time
-from typing import Optional
 from pathlib import Path
 
 from app.config import settings
 from app.core.model_loader import ModelLoader
+from app.state import get_model_loader, set_model_loader  # noqa: F401 (re-export)
 from app.api.routes import health, prediction
 
 # =============================================================================
 # LOGGING
 # =============================================================================
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+# Logging desacoplado del request path: los handlers escriben a stderr con
+# un lock + syscall por línea, así que el root logger solo encola el record
+# (put_nowait) y un QueueListener en un thread aparte hace el formateo y la
+# escritura real.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(
+    logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 )
-logger = logging.getLogger(__name__)
 
-# =============================================================================
-# GLOBAL MODEL INSTANCE
-# =============================================================================
-_model_loader: Optional[ModelLoader] = None
+_root_logger = logging.getLogger()
+_root_logger.setLevel(logging.INFO)
+_root_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
 
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, _stream_handler, respect_handler_level=True
+)
+_log_listener.start()
 
-def get_model_loader() -> Optional[ModelLoader]:
-    """Obtiene la instancia global del model loader."""
-    return _model_loader
-
+logger = logging.getLogger(__name__)
 
 # =============================================================================
 # LIFESPAN
@@ -44,8 +52,6 @@ def get_model_loader() -> Optional[ModelLoader]:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gestión del ciclo de vida de la aplicación."""
-    global _model_loader
-    
     logger.info("=" * 60)
     logger.info("Iniciando LungLife ML Service...")
     
@@ -59,24 +65,32 @@ async def lifespan(app: FastAPI):
     logger.info(f"Model exists: {model_path.exists()}")
     
     try:
-        _model_loader = ModelLoader(
+        model_loader = ModelLoader(
             model_path=str(model_path),
             shap_path=str(shap_path) if shap_path.exists() else None,
             config_path=str(config_path) if config_path.exists() else None
         )
-        _model_loader.load()
+        model_loader.load()
+        set_model_loader(model_loader)
         logger.info("✓ Modelo cargado exitosamente")
     except Exception as e:
         logger.error(f"✗ Error al cargar modelo: {e}")
         logger.warning("Servicio continuará sin modelo")
     
+    # Precalienta el schema OpenAPI: app.openapi() lo cachea en
+    # app.openapi_schema, así el primer hit a /docs u /openapi.json no paga
+    # el recorrido completo de schemas y ejemplos
+    app.openapi()
+
     logger.info("ML Service listo")
     logger.info("=" * 60)
     
     yield
     
     logger.info("Cerrando ML Service...")
-    _model_loader = None
+    set_model_loader(None)
+    # Drena los logs pendientes antes de terminar el proceso
+    _log_listener.stop()
 
 
 # =============================================================================
@@ -91,7 +105,8 @@ def create_application() -> FastAPI:
         docs_url="/docs",
         redoc_url="/redoc",
         openapi_url="/openapi.json",
-        lifespan=lifespan
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse
     )
 
     application.add_middleware(
@@ -105,6 +120,20 @@ def create_application() -> FastAPI:
     application.include_router(health.router, prefix="/api/v1", tags=["Health"])
     application.include_router(prediction.router, prefix="/api/v1", tags=["Prediction"])
 
+    @application.exception_handler(ValueError)
+    async def value_error_handler(request: Request, exc: ValueError):
+        """
+        Mapea ValueError (incluye pydantic ValidationError) a un 400 plano.
+
+        Un solo handler global serializa el error una vez, en vez de
+        envolver dicts dentro de `detail` en cada endpoint (FastAPI los
+        re-envuelve en {"detail": ...} y se paga doble serialización).
+        """
+        return ORJSONResponse(
+            status_code=400,
+            content={"error": "validation_error", "message": str(exc)}
+        )
+
     return application
 
 
@@ -115,33 +144,64 @@ app = create_application()
 # =============================================================================
 # MIDDLEWARE
 # =============================================================================
+_PROCESS_TIME_HEADER = b"x-process-time"
+
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """Middleware para logging de requests."""
-    start_time = time.time()
+    start_time = time.perf_counter()
     response = await call_next(request)
-    process_time = time.time() - start_time
-    
+    process_time = time.perf_counter() - start_time
+
     logger.info(f"{request.method} {request.url.path} - {response.status_code} - {process_time:.3f}s")
-    response.headers["X-Process-Time"] = str(process_time)
+    if settings.EXPOSE_PROCESS_TIME:
+        # append directo a raw_headers: evita el __setitem__ case-insensitive
+        # de MutableHeaders, que escanea y reconstruye la lista completa
+        response.raw_headers.append(
+            (_PROCESS_TIME_HEADER, f"{process_time:.6f}".encode())
+        )
     return response
 
 
 # =============================================================================
 # ROOT ENDPOINT
 # =============================================================================
+# Payload estático serializado una sola vez en import; cada request devuelve
+# los mismos bytes sin reconstruir el dict ni re-serializar. Se crea un
+# Response nuevo por request porque el middleware le agrega headers.
+_ROOT_BODY = orjson.dumps({
+    "service": "LungLife ML Service",
+    "version": "1.0.0",
+    "status": "running",
+    "docs": "/docs",
+    "health": "/api/v1/health"
+})
+
+
 @app.get("/")
 async def root():
     """Endpoint raíz con información del servicio."""
-    return {
-        "service": "LungLife ML Service",
-        "version": "1.0.0",
-        "status": "running",
-        "docs": "/docs",
-        "health": "/api/v1/health"
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+
+    if settings.DEBUG:
+        uvicorn.run("app.main:app", host=settings.HOST, port=settings.PORT, reload=True)
+    else:
+        # uvloop + httptools y un worker por núcleo físico. Cada worker carga
+        # su propia copia del modelo en el lifespan: presupuestar memoria.
+        uvicorn.run(
+            "app.main:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            workers=int(os.getenv("WORKERS", os.cpu_count() or 1)),
+            loop="uvloop",
+            http="httptools",
+            # El middleware log_requests ya registra cada request; el access
+            # log de uvicorn duplicaría la escritura por request
+            access_log=False
+        )
@@ -8,11 +8,60 @@ Author: LungLife Team
 Version: 1.0.0
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
-from typing import List, Optional
-
-from pydantic import BaseModel, Field, field_validator
+from typing import Any, Final, List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, field_serializer, field_validator
+
+_UTC = timezone.utc
+
+
+def _utc_now() -> datetime:
+    """Aware UTC timestamp (datetime.utcnow is deprecated and naive)."""
+    return datetime.now(_UTC)
+
+
+# OpenAPI examples hoisted to module level: built once at import instead of
+# once per class body, and shared by the deferred schema builds below.
+_EXAMPLE_PATIENT: Final = {
+    "age": 55,
+    "gender": "Male",
+    "years_smoked": 20,
+    "pack_years": 30,
+    "smoking_history": "Former",
+    "bmi": 26.5,
+    "lung_function_test_result": 75.0,
+    "air_quality_index": 120,
+    "exposure_to_toxins": True,
+    "residential_area": "Urban",
+    "tumor_size_cm": 0.0,
+    "chest_pain_symptoms": False,
+    "shortness_of_breath": True,
+    "chronic_cough": True,
+    "weight_loss": False,
+    "family_history_cancer": True,
+    "previous_cancer_diagnosis": False,
+    "comorbidities": "Hypertension",
+    "physical_activity_level": "Moderate",
+    "dietary_habits": "Balanced",
+    "occupation": "Mining"
+}
+
+_EXAMPLE_PREDICTION: Final = {
+    "prediction": "Early",
+    "probability": 0.35,
+    "risk_level": "medium",
+    "confidence": 0.70,
+    "requires_review": True,
+    "top_risk_factors": [
+        {"feature_name": "pack_years", "contribution": 0.15, "direction": "positive"},
+        {"feature_name": "lung_function", "contribution": -0.10, "direction": "negative"}
+    ],
+    "recommendation": "Seguimiento regular recomendado. Considerar tomografía de baja dosis.",
+    "timestamp": "2026-01-26T10:30:00",
+    "model_version": "1.0.0"
+}
 
 
 class RiskLevel(str, Enum):
@@ -22,6 +71,10 @@ class RiskLevel(str, Enum):
     HIGH = "high"
 
 
+# Alias kept for modules that imported the name from the old app/schemas.py
+RiskLevelEnum = RiskLevel
+
+
 class GenderEnum(str, Enum):
     """Patient gender options."""
     MALE = "Male"
@@ -42,13 +95,19 @@ class PatientDataRequest(BaseModel):
     Contains all features required for lung cancer prediction.
     """
     # Demographic features
+    # Literal en vez de Enum: pydantic-core valida literales por lookup
+    # directo sin pasar por Enum.__eq__ (los Enum quedan para el código que
+    # itera miembros)
     age: int = Field(..., ge=18, le=120, description="Patient age in years")
-    gender: GenderEnum = Field(..., description="Patient gender")
+    gender: Literal["Male", "Female"] = Field(..., description="Patient gender")
 
-    # Smoking-related features
-    years_smoked: float = Field(..., ge=0, description="Years of smoking history")
-    pack_years: float = Field(..., ge=0, description="Pack years (packs/day × years)")
-    smoking_history: SmokingHistoryEnum = Field(..., description="Smoking status")
+    # Smoking-related features (smoking_history first: the validator below
+    # reads it from info.data, which only holds already-validated fields)
+    smoking_history: Literal["Never", "Former", "Current"] = Field(
+        ..., description="Smoking status"
+    )
+    years_smoked: float = Field(default=0, ge=0, description="Years of smoking history")
+    pack_years: float = Field(default=0, ge=0, description="Pack years (packs/day × years)")
 
     # Physical metrics
     bmi: float = Field(..., ge=10, le=60, description="Body Mass Index")
@@ -79,40 +138,26 @@ class PatientDataRequest(BaseModel):
     dietary_habits: str = Field(..., description="Diet quality")
     occupation: str = Field(..., description="Patient occupation")
 
-    @field_validator('age')
+    @field_validator('years_smoked', 'pack_years', mode='before')
     @classmethod
-    def validate_age(cls, value: int) -> int:
-        """Validate age is within acceptable range."""
-        if value < 18:
-            raise ValueError("Patient must be at least 18 years old")
+    def _zero_if_never(cls, value, info):
+        """Force smoking figures to zero for never-smokers."""
+        if info.data.get('smoking_history') == "Never":
+            return 0
         return value
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "age": 55,
-                "gender": "Male",
-                "years_smoked": 20,
-                "pack_years": 30,
-                "smoking_history": "Former",
-                "bmi": 26.5,
-                "lung_function_test_result": 75.0,
-                "air_quality_index": 120,
-                "exposure_to_toxins": True,
-                "residential_area": "Urban",
-                "tumor_size_cm": 0.0,
-                "chest_pain_symptoms": False,
-                "shortness_of_breath": True,
-                "chronic_cough": True,
-                "weight_loss": False,
-                "family_history_cancer": True,
-                "previous_cancer_diagnosis": False,
-                "comorbidities": "Hypertension",
-                "physical_activity_level": "Moderate",
-                "dietary_habits": "Balanced",
-                "occupation": "Mining"
-            }
-        }
+    # defer_build postpones SchemaValidator construction until first use;
+    # the TypeAdapters in prediction_router force it at import time, still
+    # off the request path. The remaining flags are the defaults, stated
+    # explicitly so the core schema carries none of those hooks.
+    model_config = ConfigDict(
+        defer_build=True,
+        str_strip_whitespace=False,
+        validate_assignment=False,
+        populate_by_name=False,
+        arbitrary_types_allowed=False,
+        json_schema_extra={"example": _EXAMPLE_PATIENT}
+    )
 
 
 class RiskFactorDetail(BaseModel):
@@ -122,6 +167,19 @@ class RiskFactorDetail(BaseModel):
     direction: str = Field(..., description="positive or negative impact")
 
 
+class TopFeatureContribution(BaseModel):
+    """SHAP contribution of a single feature (includes the raw value)."""
+    feature: str = Field(..., description="Name of the feature")
+    value: Any = Field(..., description="Original feature value")
+    contribution: float = Field(..., description="SHAP contribution value")
+    direction: str = Field(..., description="positive or negative impact")
+
+    # Built up to 5x per prediction from trusted internal arrays: frozen +
+    # extra='forbid' lets pydantic-core take the immutable fast path and
+    # skip installing assignment validators
+    model_config = ConfigDict(extra='forbid', frozen=True)
+
+
 class PredictionResponse(BaseModel):
     """
     Response schema for prediction results.
@@ -129,35 +187,47 @@ class PredictionResponse(BaseModel):
     Contains prediction, probability, risk level, and contributing factors.
     """
     prediction: str = Field(..., description="Early or Advanced")
+    prediction_code: Optional[int] = Field(
+        None, description="Numeric code: 0=Early, 1=Advanced"
+    )
     probability: float = Field(..., ge=0, le=1, description="Probability of advanced stage")
-    risk_level: RiskLevel = Field(..., description="Risk classification")
+    risk_level: Literal["low", "medium", "high"] = Field(
+        ..., description="Risk classification"
+    )
     confidence: float = Field(..., ge=0, le=1, description="Model confidence")
     requires_review: bool = Field(..., description="Flag for manual review")
     top_risk_factors: List[RiskFactorDetail] = Field(
-        ..., 
+        default_factory=list,
         description="Top contributing factors"
     )
-    recommendation: str = Field(..., description="Clinical recommendation")
-    timestamp: datetime = Field(default_factory=datetime.now)
+    top_factors: List[TopFeatureContribution] = Field(
+        default_factory=list,
+        description="Top contributing factors with raw values"
+    )
+    recommendation: Optional[str] = Field(None, description="Clinical recommendation")
+    prediction_id: Optional[str] = Field(None, description="Unique prediction id")
+    timestamp: datetime = Field(default_factory=_utc_now)
     model_version: str = Field(default="1.0.0")
+    processing_time_ms: Optional[float] = Field(
+        None, description="Processing time in milliseconds"
+    )
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "prediction": "Early",
-                "probability": 0.35,
-                "risk_level": "medium",
-                "confidence": 0.70,
-                "requires_review": True,
-                "top_risk_factors": [
-                    {"feature_name": "pack_years", "contribution": 0.15, "direction": "positive"},
-                    {"feature_name": "lung_function", "contribution": -0.10, "direction": "negative"}
-                ],
-                "recommendation": "Seguimiento regular recomendado. Considerar tomografía de baja dosis.",
-                "timestamp": "2026-01-26T10:30:00",
-                "model_version": "1.0.0"
-            }
-        }
+    @field_serializer('probability', 'confidence')
+    def _round4(self, value: float) -> float:
+        """Round to 4 decimals at serialization time (runs in pydantic-core)."""
+        return round(value, 4)
+
+    @field_serializer('processing_time_ms')
+    def _round2(self, value: Optional[float]) -> Optional[float]:
+        """Round processing time to 2 decimals at serialization time."""
+        return None if value is None else round(value, 2)
+
+    # Response-only model, never validated from the wire
+    model_config = ConfigDict(
+        defer_build=True,
+        validate_default=False,
+        json_schema_extra={"example": _EXAMPLE_PREDICTION}
+    )
 
 
 class HealthResponse(BaseModel):
@@ -165,7 +235,7 @@ class HealthResponse(BaseModel):
     status: str = Field(..., description="Service status")
     model_loaded: bool = Field(..., description="ML model availability")
     version: str = Field(..., description="API version")
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: datetime = Field(default_factory=_utc_now)
 
 
 class ErrorResponse(BaseModel):
@@ -173,4 +243,4 @@ class ErrorResponse(BaseModel):
     error: str = Field(..., description="Error type")
     message: str = Field(..., description="Error description")
     detail: Optional[str] = Field(None, description="Additional details")
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: datetime = Field(default_factory=_utc_now)
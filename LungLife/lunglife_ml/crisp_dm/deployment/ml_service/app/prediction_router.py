@@ -3,16 +3,19 @@ LungLife ML Service - Prediction Endpoint
 Endpoint principal para realizar predicciones.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from starlette.concurrency import run_in_threadpool
 import logging
+import numpy as np
 import time
-import uuid
+from os import urandom
 from typing import Optional
 
-from app.schemas import (
-    PatientDataRequest, 
-    PredictionResponse, 
+from app.models.schemas import (
+    PatientDataRequest,
+    PredictionResponse,
     TopFeatureContribution,
     RiskLevelEnum,
     ErrorResponse
@@ -23,43 +26,101 @@ from app.dependencies import get_predictor
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Validadores precompilados una sola vez al importar: reutilizan el
+# SchemaValidator de pydantic-core en vez de pasar por el pipeline de
+# validación por-request de FastAPI. validate_json parsea los bytes del
+# body directo al modelo, sin dict intermedio.
+_PATIENT_ADAPTER = TypeAdapter(PatientDataRequest)
+_BATCH_ADAPTER = TypeAdapter(list[PatientDataRequest])
 
-def classify_risk_level(probability: float) -> RiskLevelEnum:
-    """
-    Clasifica el nivel de riesgo basado en la probabilidad.
-
-    Args:
-        probability: Probabilidad de cáncer avanzado (0-1)
 
-    Returns:
-        Nivel de riesgo (low, medium, high)
-    """
-    if probability >= 0.7:
-        return RiskLevelEnum.HIGH
-    elif probability >= 0.4:
-        return RiskLevelEnum.MEDIUM
-    return RiskLevelEnum.LOW
+# Tabla de niveles indexada por cuántos umbrales supera la probabilidad
+_RISK_TABLE = (RiskLevelEnum.LOW, RiskLevelEnum.MEDIUM, RiskLevelEnum.HIGH)
 
 
-def requires_medical_review(probability: float) -> bool:
+def _classify(probability: float) -> tuple:
     """
-    Determina si la predicción requiere revisión médica adicional.
-    Casos en zona de incertidumbre (0.3-0.7) requieren revisión.
+    Deriva en una sola pasada las tres métricas escalares de la predicción.
+
+    - Nivel de riesgo: low (<0.4), medium (0.4-0.7), high (>=0.7), resuelto
+      por índice aritmético sobre `_RISK_TABLE` en vez de branches.
+    - Revisión médica: zona de incertidumbre 0.3-0.7.
+    - Confianza: distancia al umbral 0.5, escalada a 0-1.
     """
-    return 0.3 <= probability <= 0.7
+    risk_level = _RISK_TABLE[(probability >= 0.4) + (probability >= 0.7)]
+    needs_review = 0.3 <= probability <= 0.7
+    confidence = abs(probability - 0.5) * 2
+    return risk_level, needs_review, confidence
 
 
-def calculate_confidence(probability: float) -> float:
+def _build_response(
+    result: dict,
+    predictor: Predictor,
+    prediction_id: str,
+    start_time: float
+) -> PredictionResponse:
     """
-    Calcula la confianza de la predicción.
-    Mayor distancia del umbral 0.5 = mayor confianza.
+    Construye la respuesta a partir del resultado crudo del predictor.
+
+    Post-procesamiento liviano (riesgo, confianza, SHAP top-5) compartido
+    entre `/predict` y `/predict/batch`.
     """
-    return abs(probability - 0.5) * 2
+    # Atributos del predictor cacheados en locales: LOAD_FAST en vez de un
+    # lookup de atributo por cada uso
+    threshold = predictor.threshold
+    model_version = predictor.model_version
+
+    probability = result["probability"]
+    is_advanced = probability >= threshold
+    prediction_label = "Advanced" if is_advanced else "Early"
+    prediction_code = 1 if is_advanced else 0
+
+    # Top-5 SHAP por magnitud con argpartition (O(n) en C) sobre los arrays
+    # alineados que entrega el predictor, en vez de recorrer tuplas en Python
+    top_factors = []
+    shap_values = result.get("shap_values")
+    if shap_values is not None:
+        shap_values = np.asarray(shap_values)
+        abs_values = np.abs(shap_values)
+        k = min(5, abs_values.shape[0])
+        top_idx = np.argpartition(-abs_values, k - 1)[:k]
+        top_idx = top_idx[np.argsort(-abs_values[top_idx])]
+        feature_names = result["feature_names"]
+        original_values = result["original_values"]
+        top_factors = [
+            TopFeatureContribution(
+                feature=feature_names[i],
+                value=original_values[i],
+                contribution=float(abs_values[i]),
+                direction="positive" if shap_values[i] > 0 else "negative"
+            )
+            for i in top_idx
+        ]
+
+    risk_level, needs_review, confidence = _classify(probability)
+
+    processing_time = (time.time() - start_time) * 1000
+
+    # Los floats viajan crudos: el redondeo lo hacen los field_serializer
+    # del schema en una sola pasada de serialización
+    return PredictionResponse(
+        prediction=prediction_label,
+        prediction_code=prediction_code,
+        probability=probability,
+        confidence=confidence,
+        risk_level=risk_level,
+        requires_review=needs_review,
+        top_factors=top_factors,
+        model_version=model_version,
+        prediction_id=prediction_id,
+        processing_time_ms=processing_time
+    )
 
 
 @router.post(
     "/predict",
     response_model=PredictionResponse,
+    response_class=ORJSONResponse,
     responses={
         400: {"model": ErrorResponse, "description": "Datos de entrada inválidos"},
         500: {"model": ErrorResponse, "description": "Error interno del servidor"},
@@ -69,15 +130,14 @@ def calculate_confidence(probability: float) -> float:
     description="Recibe datos del paciente y retorna la predicción con interpretabilidad"
 )
 async def predict(
-    patient_data: PatientDataRequest,
-    background_tasks: BackgroundTasks,
+    request: Request,
     predictor: Predictor = Depends(get_predictor)
 ) -> PredictionResponse:
     """
     Endpoint principal de predicción.
 
     Proceso:
-    1. Valida los datos de entrada (Pydantic)
+    1. Valida los datos de entrada (TypeAdapter precompilado)
     2. Preprocesa los datos
     3. Realiza la predicción
     4. Calcula explicaciones SHAP
@@ -85,96 +145,92 @@ async def predict(
     6. Retorna respuesta estructurada
     """
     start_time = time.time()
-    prediction_id = f"pred_{uuid.uuid4().hex[:12]}"
+    # urandom(6).hex() da los 12 hex chars directo, sin construir un UUID
+    # completo para después recortarlo
+    prediction_id = f"pred_{urandom(6).hex()}"
+
+    # ValidationError (subclase de ValueError) propaga al exception handler
+    # global, que la mapea a un 400 plano en una sola serialización
+    patient_data = _PATIENT_ADAPTER.validate_json(await request.body())
 
     try:
         logger.info(f"[{prediction_id}] Iniciando predicción")
 
-        # Convertir request a diccionario
-        patient_dict = patient_data.model_dump()
-
-        # Realizar predicción
-        result = predictor.predict(patient_dict)
-
-        probability = result["probability"]
-        prediction_label = "Advanced" if probability >= predictor.threshold else "Early"
-        prediction_code = 1 if probability >= predictor.threshold else 0
-
-        # Obtener factores contribuyentes (SHAP)
-        top_factors = []
-        if "shap_values" in result:
-            for feature, shap_value, original_value in result["shap_values"][:5]:
-                top_factors.append(TopFeatureContribution(
-                    feature=feature,
-                    value=original_value,
-                    contribution=abs(shap_value),
-                    direction="positive" if shap_value > 0 else "negative"
-                ))
-
-        # Calcular métricas adicionales
-        risk_level = classify_risk_level(probability)
-        needs_review = requires_medical_review(probability)
-        confidence = calculate_confidence(probability)
-
-        processing_time = (time.time() - start_time) * 1000
-
-        response = PredictionResponse(
-            prediction=prediction_label,
-            prediction_code=prediction_code,
-            probability=round(probability, 4),
-            confidence=round(confidence, 4),
-            risk_level=risk_level,
-            requires_review=needs_review,
-            top_factors=top_factors,
-            model_version=predictor.model_version,
-            prediction_id=prediction_id,
-            processing_time_ms=round(processing_time, 2)
-        )
+        # El modelo validado va directo al predictor (predict_model lee los
+        # campos por atributo a una fila numpy preasignada): se evita el
+        # model_dump() que recorre todo el árbol y asigna un dict por request.
+        # La inferencia corre en el threadpool: modelo + SHAP son CPU-bound
+        # y bloquearían el event loop para el resto de requests.
+        result = await run_in_threadpool(predictor.predict_model, patient_data)
+
+        response = _build_response(result, predictor, prediction_id, start_time)
 
         logger.info(
             f"[{prediction_id}] Predicción completada: "
-            f"{prediction_label} (prob={probability:.4f}) "
-            f"en {processing_time:.2f}ms"
+            f"{response.prediction} (prob={response.probability:.4f}) "
+            f"en {response.processing_time_ms:.2f}ms"
         )
 
         return response
 
-    except ValueError as e:
-        logger.error(f"[{prediction_id}] Error de validación: {e}")
-        raise HTTPException(
-            status_code=400,
-            detail={"error": "validation_error", "message": str(e)}
-        )
+    except ValueError:
+        # Deja que el handler global de ValueError arme el 400 plano
+        raise
     except Exception as e:
         logger.error(f"[{prediction_id}] Error interno: {e}")
         raise HTTPException(
             status_code=500,
-            detail={"error": "prediction_error", "message": "Error al procesar la predicción"}
+            detail="Error al procesar la predicción"
         )
 
 
 @router.post(
     "/predict/batch",
+    response_class=ORJSONResponse,
     summary="Predicción en lote",
     description="Realiza predicciones para múltiples pacientes"
 )
 async def predict_batch(
-    patients: list[PatientDataRequest],
+    request: Request,
     predictor: Predictor = Depends(get_predictor)
 ):
-    """Endpoint para predicciones en lote."""
+    """
+    Endpoint para predicciones en lote.
+
+    Una sola llamada vectorizada al predictor (modelo + SHAP sobre la matriz
+    completa) en vez de N pasadas por el handler de `/predict`: el costo por
+    fila del modelo se amortiza en una multiplicación de matrices.
+    """
+    patients = _BATCH_ADAPTER.validate_json(await request.body())
+
     if len(patients) > 100:
         raise HTTPException(
             status_code=400,
             detail="Máximo 100 pacientes por solicitud"
         )
 
-    results = []
-    for patient in patients:
-        try:
-            result = await predict(patient, BackgroundTasks(), predictor)
-            results.append({"status": "success", "result": result})
-        except HTTPException as e:
-            results.append({"status": "error", "error": e.detail})
+    start_time = time.time()
+    batch_id = f"batch_{urandom(6).hex()}"
+
+    try:
+        dicts = [patient.model_dump() for patient in patients]
+        raw_results = await run_in_threadpool(predictor.predict_batch, dicts)
+    except Exception as e:
+        logger.error(f"[{batch_id}] Error en lote: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Error al procesar el lote"
+        )
+
+    # Post-procesamiento liviano por fila (riesgo/confianza/top factores)
+    results = [
+        {
+            "status": "success",
+            "result": _build_response(
+                result, predictor, f"{batch_id}_{i}", start_time
+            )
+        }
+        for i, result in enumerate(raw_results)
+    ]
 
     return {"predictions": results, "total": len(results)}
@@ -8,7 +8,7 @@ Author: LungLife Team
 Version: 1.0.0
 """
 
-from typing import Dict, List, Tuple
+from typing import ClassVar, Dict, List, Tuple
 import numpy as np
 import pandas as pd
 import joblib
@@ -35,6 +35,26 @@ class PredictionService:
     REVIEW_LOWER_BOUND = 0.3
     REVIEW_UPPER_BOUND = 0.7
 
+    # Max entries in the encoded-row -> probability memo; cleared wholesale
+    # on overflow (cheaper than LRU bookkeeping for a bounded key space)
+    PROBA_CACHE_MAX = 4096
+
+    # Clinical recommendations per risk level (built once, not per request)
+    RECOMMENDATIONS: ClassVar[Dict[RiskLevel, str]] = {
+        RiskLevel.HIGH: (
+            "Derivación urgente a oncología pulmonar. "
+            "Se recomienda tomografía de alta resolución y biopsia."
+        ),
+        RiskLevel.MEDIUM: (
+            "Seguimiento médico requerido. "
+            "Considerar tomografía de baja dosis en 3 meses."
+        ),
+        RiskLevel.LOW: (
+            "Riesgo bajo detectado. "
+            "Mantener controles preventivos anuales."
+        ),
+    }
+
     def __init__(self, model, label_encoders: Dict, config: Dict):
         """
         Initialize prediction service with model and preprocessors.
@@ -50,6 +70,62 @@ class PredictionService:
         self._feature_columns = config.get('preprocessing', {}).get('feature_columns', [])
         self._threshold = config.get('prediction', {}).get('threshold', 0.5)
 
+        # Hot callable bound once: skips the estimator attribute lookup per
+        # request (a compiled tree backend could be slotted in here if one
+        # is ever added as a dependency)
+        self._predict_proba = model.predict_proba
+
+        # Column -> position in the model's feature order, resolved once so
+        # the single-row path can write straight into a numpy array instead
+        # of building and reindexing a 1-row DataFrame per request
+        self._col_index = {c: i for i, c in enumerate(self._feature_columns)}
+        self._n_features = len(self._feature_columns)
+
+        # {column: {class label -> int code}} resolved once: encoding a
+        # categorical becomes an O(1) dict lookup instead of a per-request
+        # encoder.transform (searchsorted over classes_ plus allocations);
+        # LabelEncoder assigns codes by position in classes_
+        self._enc_maps = {
+            col: {str(c): i for i, c in enumerate(enc.classes_)}
+            for col, enc in self._label_encoders.items()
+        }
+
+        # Row-fill plan specialized for the fixed feature schema: the
+        # categorical-vs-numeric decision and the encoder map resolution
+        # happen once here, so the per-request loop is straight-line
+        self._cat_plan = [
+            (idx, col, self._enc_maps[col])
+            for col, idx in self._col_index.items()
+            if col in self._enc_maps
+        ]
+        self._num_plan = [
+            (idx, col)
+            for col, idx in self._col_index.items()
+            if col not in self._enc_maps
+        ]
+
+        # Repeat payloads produce identical encoded rows, so the model's
+        # answer can be memoized on the row bytes (see predict)
+        self._proba_cache: Dict[bytes, float] = {}
+
+        # Feature importances are immutable for the service lifetime: rank
+        # them once here instead of re-zipping and sorting per request
+        self._top_factors_cache: List[RiskFactorDetail] = []
+        if hasattr(model, 'feature_importances_'):
+            ranked = sorted(
+                zip(self._feature_columns, model.feature_importances_),
+                key=lambda x: abs(x[1]),
+                reverse=True
+            )[:5]
+            self._top_factors_cache = [
+                RiskFactorDetail(
+                    feature_name=name,
+                    contribution=round(float(importance), 4),
+                    direction="positive" if importance > 0 else "negative"
+                )
+                for name, importance in ranked
+            ]
+
     def predict(self, patient_data: PatientDataRequest) -> PredictionResponse:
         """
         Generate prediction for patient data.
@@ -60,21 +136,27 @@ class PredictionService:
         Returns:
             PredictionResponse with prediction, probability, and risk factors
         """
-        # Step 1: Convert to DataFrame
-        features_df = self._prepare_features(patient_data)
-
-        # Step 2: Encode categorical features
-        encoded_df = self._encode_features(features_df)
-
-        # Step 3: Get prediction and probability
-        probability = self._get_probability(encoded_df)
+        # Step 1-2: Write features straight into a (1, F) numpy row (mapping,
+        # derived features and categorical encoding in one pass, no DataFrame)
+        row = self._prepare_row(patient_data)
+
+        # Step 3: Get prediction and probability. Identical feature vectors
+        # (common in what-if UI flows, where most inputs are binary) skip the
+        # model entirely via the memo keyed on the encoded row bytes.
+        key = row.tobytes()
+        probability = self._proba_cache.get(key)
+        if probability is None:
+            probability = float(self._predict_proba(row)[0, 1])
+            if len(self._proba_cache) >= self.PROBA_CACHE_MAX:
+                self._proba_cache.clear()
+            self._proba_cache[key] = probability
         prediction = self._classify_prediction(probability)
 
         # Step 4: Classify risk level
         risk_level = self._classify_risk(probability)
 
         # Step 5: Get top risk factors
-        top_factors = self._get_top_risk_factors(encoded_df)
+        top_factors = self._get_top_risk_factors()
 
         # Step 6: Generate recommendation
         recommendation = self._generate_recommendation(risk_level, prediction)
@@ -87,17 +169,116 @@ class PredictionService:
 
         return PredictionResponse(
             prediction=prediction,
-            probability=round(probability, 4),
+            probability=probability,
             risk_level=risk_level,
-            confidence=round(confidence, 4),
+            confidence=confidence,
             requires_review=requires_review,
             top_risk_factors=top_factors,
             recommendation=recommendation,
             model_version=self._config.get('version', '1.0.0'),
         )
 
+    def predict_batch(
+        self,
+        patients: List[PatientDataRequest]
+    ) -> List[PredictionResponse]:
+        """
+        Generate predictions for a batch of patients in one model pass.
+
+        Stacks all feature rows into a single float32 matrix and issues one
+        vectorized predict_proba call, so per-row Python overhead and model
+        invocation cost are amortized across the batch.
+
+        Args:
+            patients: Validated patient data requests
+
+        Returns:
+            One PredictionResponse per patient, in input order
+        """
+        if not patients:
+            return []
+
+        # SoA: one array per raw column, then every derived feature is
+        # computed vectorized over the whole batch instead of per row
+        raw = [self._map_raw(p) for p in patients]
+        arrs = {col: np.array([r.get(col) for r in raw]) for col in raw[0]}
+        self._add_derived_features_vec(arrs)
+
+        # float32 matrix like the single-row path: half the cache footprint
+        # of float64 and sklearn tree models accept it directly
+        features = self._encode_matrix(arrs, len(patients))
+        probabilities = self._predict_proba(features)[:, 1]
+
+        # Vectorized classification over the whole probability vector
+        predictions = np.where(
+            probabilities >= self._threshold, "Advanced", "Early"
+        )
+        risk_levels = np.select(
+            [
+                probabilities >= self.HIGH_RISK_THRESHOLD,
+                probabilities >= self.MEDIUM_RISK_THRESHOLD,
+            ],
+            [RiskLevel.HIGH, RiskLevel.MEDIUM],
+            default=RiskLevel.LOW
+        )
+        requires_review = (
+            (probabilities >= self.REVIEW_LOWER_BOUND)
+            & (probabilities <= self.REVIEW_UPPER_BOUND)
+        )
+        confidences = np.abs(probabilities - 0.5) * 2
+
+        # Feature importances are row-independent: compute once per batch
+        top_factors = self._get_top_risk_factors()
+        model_version = self._config.get('version', '1.0.0')
+
+        return [
+            PredictionResponse(
+                prediction=predictions[i],
+                probability=float(probabilities[i]),
+                risk_level=risk_levels[i],
+                confidence=float(confidences[i]),
+                requires_review=bool(requires_review[i]),
+                top_risk_factors=top_factors,
+                recommendation=self._generate_recommendation(
+                    risk_levels[i], predictions[i]
+                ),
+                model_version=model_version,
+            )
+            for i in range(len(patients))
+        ]
+
+    def _prepare_row(self, patient_data: PatientDataRequest) -> np.ndarray:
+        """
+        Build the encoded (1, F) float32 feature row for one patient.
+
+        Writes each mapped/derived value directly at its column position via
+        the precomputed index, replacing the per-request 1-row DataFrame,
+        its copy in _encode_features and the final column reindex.
+        """
+        mapped = self._map_patient(patient_data)
+
+        row = np.zeros((1, self._n_features), dtype=np.float32)
+        # Plans precompiled at init: no per-column kind check or encoder
+        # lookup on the request path
+        for idx, col, enc_map in self._cat_plan:
+            # -1 for labels unseen at training time
+            row[0, idx] = enc_map.get(str(mapped.get(col)), -1)
+        for idx, col in self._num_plan:
+            value = mapped.get(col)
+            if value is not None:
+                row[0, idx] = value
+        return row
+
     def _prepare_features(self, patient_data: PatientDataRequest) -> pd.DataFrame:
-        """Convert patient data to feature DataFrame."""
+        """Convert patient data to a 1-row feature DataFrame (batch path)."""
+        return pd.DataFrame([self._map_patient(patient_data)])
+
+    def _map_patient(self, patient_data: PatientDataRequest) -> Dict:
+        """Map patient fields to model feature names and add derived features."""
+        return self._add_derived_features(self._map_raw(patient_data))
+
+    def _map_raw(self, patient_data: PatientDataRequest) -> Dict:
+        """Map patient fields to model feature names (no derived features)."""
         data_dict = patient_data.model_dump()
 
         # Map Pydantic fields to model feature names
@@ -131,65 +312,162 @@ class PredictionService:
             if k in feature_mapping
         }
 
-        # Add derived features
-        mapped_data = self._add_derived_features(mapped_data)
-
-        return pd.DataFrame([mapped_data])
+        return mapped_data
 
     def _add_derived_features(self, data: Dict) -> Dict:
-        """Calculate derived features required by the model."""
+        """
+        Calculate derived features required by the model.
+
+        Each source field is read into a local once and each derived value
+        is computed in a local before the single dict store, so the dict is
+        hashed once per key instead of re-reading intermediates.
+        (The model's hyphenated feature names — e.g. 'Age_Group_18-40' —
+        rule out an attribute/slots-based carrier for this stage.)
+        """
         age = data.get('Age', 0)
+        pack_years = data.get('Pack_Years', 0)
+        smoking_history = data.get('Smoking_History')
+        aqi = data.get('Air_Quality_Index', 0)
+        toxins = data.get('Exposure_to_Toxins', False)
+
+        pack_years_norm = min(pack_years / 50.0, 1.0)
+        symptom_count = (
+            bool(data.get('Chest_Pain_Symptoms'))
+            + bool(data.get('Shortness_of_Breath'))
+            + bool(data.get('Chronic_Cough'))
+            + bool(data.get('Weight_Loss'))
+        )
+        environmental_risk = (aqi / 500.0) + (0.3 if toxins else 0)
 
         # Age groups
         data['Age_Group_18-40'] = 1 if 18 <= age <= 40 else 0
         data['Age_Group_41-60'] = 1 if 41 <= age <= 60 else 0
         data['Age_Group_61+'] = 1 if age > 60 else 0
 
-        # Pack years normalized
-        pack_years = data.get('Pack_Years', 0)
-        data['Pack_Years_Normalized'] = min(pack_years / 50.0, 1.0)
+        data['Pack_Years_Normalized'] = pack_years_norm
 
         # Smoking risk level
-        if data.get('Smoking_History') == 'Current':
+        if smoking_history == 'Current':
             data['Smoking_Risk_Level'] = 'High'
-        elif data.get('Smoking_History') == 'Former':
+        elif smoking_history == 'Former':
             data['Smoking_Risk_Level'] = 'Medium'
         else:
             data['Smoking_Risk_Level'] = 'Low'
 
-        # Symptom count
-        symptoms = ['Chest_Pain_Symptoms', 'Shortness_of_Breath', 
-                    'Chronic_Cough', 'Weight_Loss']
-        data['Symptom_Count'] = sum(1 for s in symptoms if data.get(s))
-
-        # Environmental risk
-        aqi = data.get('Air_Quality_Index', 0)
-        toxins = data.get('Exposure_to_Toxins', False)
-        data['Environmental_Risk'] = (aqi / 500.0) + (0.3 if toxins else 0)
+        data['Symptom_Count'] = symptom_count
+        data['Environmental_Risk'] = environmental_risk
 
-        # Risk score composite
         data['Risk_Score_Composite'] = (
-            data['Pack_Years_Normalized'] * 0.3 +
-            data['Symptom_Count'] / 4.0 * 0.3 +
-            data['Environmental_Risk'] * 0.2 +
+            pack_years_norm * 0.3 +
+            symptom_count / 4.0 * 0.3 +
+            environmental_risk * 0.2 +
             (1 if data.get('Family_History_Cancer') else 0) * 0.2
         )
 
         return data
 
+    def _add_derived_features_vec(self, arrs: Dict[str, np.ndarray]) -> Dict:
+        """
+        Vectorized counterpart of _add_derived_features for batch mode.
+
+        Operates in place on a dict of column arrays: each derived feature
+        is one numpy expression over the whole batch instead of per-row
+        Python conditionals and string compares. Arithmetic runs in
+        float32 with in-place ufuncs where a buffer can be reused, keeping
+        temporaries (and memory passes) to a minimum.
+        """
+        age = arrs['Age']
+        arrs['Age_Group_18-40'] = ((age >= 18) & (age <= 40)).astype(np.int8)
+        arrs['Age_Group_41-60'] = ((age >= 41) & (age <= 60)).astype(np.int8)
+        arrs['Age_Group_61+'] = (age > 60).astype(np.int8)
+
+        pack_years_norm = np.minimum(
+            arrs['Pack_Years'].astype(np.float32) * np.float32(1.0 / 50.0),
+            np.float32(1.0)
+        )
+        arrs['Pack_Years_Normalized'] = pack_years_norm
+
+        smoking = arrs['Smoking_History']
+        arrs['Smoking_Risk_Level'] = np.where(
+            smoking == 'Current', 'High',
+            np.where(smoking == 'Former', 'Medium', 'Low')
+        )
+
+        symptom_count = (
+            arrs['Chest_Pain_Symptoms'].astype(np.int8)
+            + arrs['Shortness_of_Breath'].astype(np.int8)
+            + arrs['Chronic_Cough'].astype(np.int8)
+            + arrs['Weight_Loss'].astype(np.int8)
+        )
+        arrs['Symptom_Count'] = symptom_count
+
+        environmental_risk = arrs['Air_Quality_Index'].astype(np.float32)
+        environmental_risk *= np.float32(1.0 / 500.0)
+        np.add(
+            environmental_risk, np.float32(0.3),
+            out=environmental_risk,
+            where=arrs['Exposure_to_Toxins'].astype(bool)
+        )
+        arrs['Environmental_Risk'] = environmental_risk
+
+        # Composite accumulated into one buffer instead of a chained
+        # expression that materializes an intermediate per term
+        composite = pack_years_norm * np.float32(0.3)
+        composite += symptom_count.astype(np.float32) * np.float32(0.3 / 4.0)
+        composite += environmental_risk * np.float32(0.2)
+        composite += arrs['Family_History_Cancer'].astype(np.float32) * np.float32(0.2)
+        arrs['Risk_Score_Composite'] = composite
+
+        return arrs
+
+    def _encode_matrix(self, arrs: Dict[str, np.ndarray], n_rows: int) -> np.ndarray:
+        """
+        Encode a column dict straight into a (n_rows, n_features) matrix.
+
+        Pandas-free twin of _encode_features for the batch path: no
+        DataFrame construction, no column copy/reindex, and the model gets
+        a plain float32 ndarray so sklearn skips its feature-name checks.
+        Missing columns stay 0, unknown labels encode as -1.
+        """
+        features = np.zeros((n_rows, self._n_features), dtype=np.float32)
+
+        for idx, col, _ in self._cat_plan:
+            if col not in arrs:
+                continue
+            cls = self._label_encoders[col].classes_
+            vals = arrs[col].astype(str)
+            pos = np.searchsorted(cls, vals)
+            features[:, idx] = np.where(
+                (pos < len(cls)) & (cls[np.minimum(pos, len(cls) - 1)] == vals),
+                pos,
+                -1
+            )
+
+        for idx, col in self._num_plan:
+            if col in arrs:
+                features[:, idx] = arrs[col].astype(np.float32)
+
+        return features
+
     def _encode_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Encode categorical features using stored label encoders."""
         encoded_df = df.copy()
 
         for col, encoder in self._label_encoders.items():
             if col in encoded_df.columns:
-                try:
-                    encoded_df[col] = encoder.transform(
-                        encoded_df[col].astype(str)
-                    )
-                except ValueError:
-                    # Handle unseen labels
-                    encoded_df[col] = -1
+                # Branchless vectorized lookup instead of encoder.transform
+                # wrapped in try/except: one unseen label no longer unwinds
+                # an exception and wipes the whole column to -1, it just
+                # encodes that row as -1. classes_ is sorted, so
+                # searchsorted gives the candidate code directly.
+                cls = encoder.classes_
+                vals = encoded_df[col].astype(str).to_numpy()
+                idx = np.searchsorted(cls, vals)
+                encoded_df[col] = np.where(
+                    (idx < len(cls)) & (cls[np.minimum(idx, len(cls) - 1)] == vals),
+                    idx,
+                    -1
+                )
 
         # Ensure all required columns exist
         for col in self._feature_columns:
@@ -218,28 +496,9 @@ class PredictionService:
             return RiskLevel.MEDIUM
         return RiskLevel.LOW
 
-    def _get_top_risk_factors(
-        self, 
-        encoded_df: pd.DataFrame, 
-        top_n: int = 5
-    ) -> List[RiskFactorDetail]:
-        """Extract top contributing risk factors using feature importance."""
-        if not hasattr(self._model, 'feature_importances_'):
-            return []
-
-        importances = self._model.feature_importances_
-        feature_importance = list(zip(self._feature_columns, importances))
-        feature_importance.sort(key=lambda x: abs(x[1]), reverse=True)
-
-        top_factors = []
-        for feature_name, importance in feature_importance[:top_n]:
-            top_factors.append(RiskFactorDetail(
-                feature_name=feature_name,
-                contribution=round(float(importance), 4),
-                direction="positive" if importance > 0 else "negative"
-            ))
-
-        return top_factors
+    def _get_top_risk_factors(self, top_n: int = 5) -> List[RiskFactorDetail]:
+        """Return the top contributing risk factors (ranked once at init)."""
+        return self._top_factors_cache[:top_n]
 
     def _generate_recommendation(
         self, 
@@ -247,21 +506,7 @@ class PredictionService:
         prediction: str
     ) -> str:
         """Generate clinical recommendation based on risk level."""
-        recommendations = {
-            RiskLevel.HIGH: (
-                "Derivación urgente a oncología pulmonar. "
-                "Se recomienda tomografía de alta resolución y biopsia."
-            ),
-            RiskLevel.MEDIUM: (
-                "Seguimiento médico requerido. "
-                "Considerar tomografía de baja dosis en 3 meses."
-            ),
-            RiskLevel.LOW: (
-                "Riesgo bajo detectado. "
-                "Mantener controles preventivos anuales."
-            ),
-        }
-        return recommendations.get(risk_level, "Consulte con su médico.")
+        return self.RECOMMENDATIONS.get(risk_level, "Consulte con su médico.")
 
     def _requires_manual_review(self, probability: float) -> bool:
         """Determine if prediction requires manual clinical review."""
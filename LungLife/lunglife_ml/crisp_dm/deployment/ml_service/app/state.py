@@ -0,0 +1,22 @@
+"""
+Estado compartido de la aplicación.
+
+Módulo mínimo, sin dependencias de FastAPI, para que los routers importen
+el model loader a nivel de módulo sin crear imports circulares con app.main.
+"""
+from typing import Optional
+
+from app.core.model_loader import ModelLoader
+
+_model_loader: Optional[ModelLoader] = None
+
+
+def set_model_loader(loader: Optional[ModelLoader]) -> None:
+    """Registra la instancia global del model loader."""
+    global _model_loader
+    _model_loader = loader
+
+
+def get_model_loader() -> Optional[ModelLoader]:
+    """Obtiene la instancia global del model loader."""
+    return _model_loader
@@ -4,11 +4,13 @@
 # Ejecutar: python health_check.py
 # ============================================================================
 
-import requests
+import asyncio
 import sys
 from datetime import datetime
 from typing import Dict, Tuple
 
+import aiohttp
+
 # Configuración de servicios
 SERVICES = {
     "frontend": {
@@ -31,11 +33,16 @@ SERVICES = {
 TIMEOUT = 5  # segundos
 
 
-def check_service(name: str, config: Dict) -> Tuple[bool, str]:
+async def check_service(
+    session: aiohttp.ClientSession,
+    name: str,
+    config: Dict
+) -> Tuple[bool, str]:
     """
     Verifica el estado de un servicio.
 
     Args:
+        session: Sesión HTTP compartida
         name: Nombre del servicio
         config: Configuración del servicio
 
@@ -43,14 +50,17 @@ def check_service(name: str, config: Dict) -> Tuple[bool, str]:
         Tupla (is_healthy, message)
     """
     try:
-        response = requests.get(config["url"], timeout=TIMEOUT)
-        if response.status_code == 200:
-            return True, f"OK (status: {response.status_code})"
-        else:
-            return False, f"WARN (status: {response.status_code})"
-    except requests.ConnectionError:
+        async with session.get(
+            config["url"],
+            timeout=aiohttp.ClientTimeout(total=TIMEOUT)
+        ) as response:
+            if response.status == 200:
+                return True, f"OK (status: {response.status})"
+            else:
+                return False, f"WARN (status: {response.status})"
+    except aiohttp.ClientConnectorError:
         return False, "ERROR: Connection refused"
-    except requests.Timeout:
+    except asyncio.TimeoutError:
         return False, f"ERROR: Timeout ({TIMEOUT}s)"
     except Exception as e:
         return False, f"ERROR: {str(e)}"
@@ -83,13 +93,24 @@ def print_report(results: Dict[str, Tuple[bool, str]]) -> None:
     print("=" * 60 + "\n")
 
 
+async def _run_checks() -> Dict[str, Tuple[bool, str]]:
+    """Dispara todos los probes en paralelo con una sola sesión HTTP."""
+    async with aiohttp.ClientSession() as session:
+        statuses = await asyncio.gather(*[
+            check_service(session, name, config)
+            for name, config in SERVICES.items()
+        ])
+    return dict(zip(SERVICES.keys(), statuses))
+
+
 def main():
-    """Ejecuta health check de todos los servicios."""
-    results = {}
+    """
+    Ejecuta health check de todos los servicios.
 
-    for name, config in SERVICES.items():
-        is_healthy, message = check_service(name, config)
-        results[name] = (is_healthy, message)
+    Los probes corren concurrentes: el peor caso pasa de sum(timeouts)
+    (15s secuenciales) a max(timeout) (5s).
+    """
+    results = asyncio.run(_run_checks())
 
     print_report(results)
 